@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
+import json
 import os
+import random
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth1Session
+from urllib3.util.retry import Retry
 
 # Use api.x.com (often avoids Cloudflare behaviour seen on api.twitter.com from GitHub runners)
 POST_URL = "https://api.x.com/2/tweets"
 
+BACKOFFS = (2, 5, 10, 20, 30)  # seconds; fallback schedule when the server doesn't say how long
+MAX_RATE_LIMIT_WAIT = 900  # one X rate-limit window; a later reset fails the chunk instead
+
 
 def get_session():
     api_key = os.getenv("X_API_KEY")
@@ -41,6 +51,23 @@ def get_session():
             "Accept": "application/json",
         }
     )
+
+    # Pooled keep-alive for the whole thread, with 5xx retried at the transport layer.
+    # 429 is left to post_with_retries, which reads X's x-rate-limit-reset header.
+    # raise_on_status=False hands the last response back once retries are exhausted.
+    adapter = HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=4,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=2,
+            status_forcelist=(500, 502, 503, 504),
+            respect_retry_after_header=True,
+            allowed_methods=frozenset(["POST"]),
+            raise_on_status=False,
+        ),
+    )
+    sess.mount("https://", adapter)
     return sess
 
 
@@ -57,17 +84,35 @@ def looks_like_cloudflare(resp_text: str) -> bool:
     return False
 
 
+def rate_limit_wait(headers, fallback: float) -> float:
+    """
+    Seconds to wait before retrying a 429, taken from the server's own hints:
+    'retry-after' (seconds) first, then 'x-rate-limit-reset' (unix timestamp).
+    Not clamped: the caller decides whether a long wait is worth sleeping through.
+    """
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    reset = headers.get("x-rate-limit-reset")
+    if reset:
+        try:
+            return max(float(reset) - time.time(), 0.0) + 1
+        except ValueError:
+            pass
+    return fallback
+
+
 def post_with_retries(session, payload: dict, label: str, idx: int, max_attempts: int = 5):
     """
-    Retry on:
-      - Cloudflare challenge HTML
-      - 429 rate limiting
-      - transient 5xx errors
+    Retry on Cloudflare challenge HTML (served as 200, so the session's transport-level
+    Retry can't see it), and on 429 for as long as the rate-limit headers ask, up to
+    MAX_RATE_LIMIT_WAIT. Transient 5xx errors are retried by the session adapter.
 
     Returns (resp_status_code, resp_text).
     """
-    backoffs = [2, 5, 10, 20, 30]  # seconds
-
     last_status = None
     last_text = ""
 
@@ -81,17 +126,23 @@ def post_with_retries(session, payload: dict, label: str, idx: int, max_attempts
         print(f"[{label}] CHUNK {idx} attempt {attempt}/{max_attempts} status: {last_status}")
         print(f"[{label}] CHUNK {idx} attempt {attempt} body (trunc): {trunc}")
 
-        # Cloudflare HTML challenge → retry
+        fallback = BACKOFFS[min(attempt - 1, len(BACKOFFS) - 1)]
+
+        # Cloudflare HTML challenge → retry (jittered so parallel runs don't retry in lockstep)
         if looks_like_cloudflare(last_text):
-            wait = backoffs[min(attempt - 1, len(backoffs) - 1)]
-            print(f"[{label}] CHUNK {idx} Cloudflare challenge detected. Waiting {wait}s then retrying…")
+            wait = random.uniform(0.5, 1.5) * fallback
+            print(f"[{label}] CHUNK {idx} Cloudflare challenge detected. Waiting {wait:.1f}s then retrying…")
             time.sleep(wait)
             continue
 
-        # Retryable HTTP status codes
-        if last_status in (429, 500, 502, 503, 504):
-            wait = backoffs[min(attempt - 1, len(backoffs) - 1)]
-            print(f"[{label}] CHUNK {idx} transient status {last_status}. Waiting {wait}s then retrying…")
+        # Rate limited → sleep exactly what the server asks,
+        # unless the limit resets too far out (e.g. daily tweet cap) to be worth waiting for
+        if last_status == 429 and attempt < max_attempts:
+            wait = rate_limit_wait(resp.headers, fallback)
+            if wait > MAX_RATE_LIMIT_WAIT:
+                print(f"[{label}] CHUNK {idx} rate limited for {wait:.0f}s (> {MAX_RATE_LIMIT_WAIT}s). Giving up.")
+                return last_status, last_text
+            print(f"[{label}] CHUNK {idx} rate limited. Waiting {wait:.1f}s then retrying…")
             time.sleep(wait)
             continue
 
@@ -101,25 +152,38 @@ def post_with_retries(session, payload: dict, label: str, idx: int, max_attempts
     return last_status or 0, last_text
 
 
-def post_thread(session, base_path: str, label: str, soft_fail: bool = False):
-    idx = 1
+def thread_files(base_path: str):
+    """
+    Return [(idx, path), ...] for every '<base_path>_<idx>.txt', sorted by idx.
+
+    One directory read replaces probing each index with os.path.exists().
+    """
+    directory, prefix = os.path.split(base_path)
+    pat = re.compile(rf"^{re.escape(prefix)}_(\d+)\.txt$")
+    with os.scandir(directory or ".") as it:
+        return sorted((int(m.group(1)), e.path) for e in it if (m := pat.match(e.name)))
+
+
+def post_thread(session, base_path: str, label: str, soft_fail: bool = False, first_posted=None):
+    """
+    Post '<base_path>_<n>.txt' files as one reply chain.
+
+    If given, `first_posted` (a threading.Event) is set once the first tweet has been posted
+    successfully, so another thread can wait for this one to be at the top of the timeline order.
+    """
     parent_id = None
 
-    while True:
-        path = f"{base_path}_{idx}.txt"
-        if not os.path.exists(path):
-            if idx == 1:
-                print(f"[{label}] No files found starting with {base_path}_1.txt — nothing to post.")
-            else:
-                print(f"[{label}] Completed thread: {idx-1} tweet(s) posted.")
-            break
+    files = thread_files(base_path)
+    if not files:
+        print(f"[{label}] No files found starting with {base_path}_1.txt — nothing to post.")
+        return True
 
+    for idx, path in files:
         with open(path, "r", encoding="utf-8") as f:
             text = f.read().strip()
 
         if not text:
             print(f"[{label}] {path} is empty, skipping.")
-            idx += 1
             continue
 
         print(f"===== {label} CHUNK {idx} MESSAGE PREVIEW =====")
@@ -144,14 +208,15 @@ def post_thread(session, base_path: str, label: str, soft_fail: bool = False):
 
         # Parse parent tweet id for threading
         try:
-            data = __import__("json").loads(body).get("data", {})
-            parent_id = data.get("id", parent_id)
+            parent_id = json.loads(body).get("data", {}).get("id", parent_id)
         except Exception:
             print(f"[{label}] Warning: could not parse tweet ID from response JSON.")
 
         print(f"[{label}] Successfully posted chunk {idx} to X.")
-        idx += 1
+        if first_posted is not None:
+            first_posted.set()
 
+    print(f"[{label}] Completed thread: {len(files)} tweet(s) posted.")
     return True
 
 
@@ -162,14 +227,41 @@ def main():
     # Set in workflow env: X_SOFT_FAIL_FALLERS=true
     soft_fail_fallers = os.getenv("X_SOFT_FAIL_FALLERS", "false").lower() == "true"
 
-    # Post FALLERS first so RISERS appear above in timeline
-    post_thread(session, "x_status_fallers", "FALLERS", soft_fail=soft_fail_fallers)
+    # Post FALLERS first so RISERS appear above in timeline. Only the first FALLERS tweet
+    # has to go out before RISERS starts; after that the two independent reply chains
+    # are posted concurrently over the same keep-alive session (pool_maxsize >= 2).
+    # A hard FALLERS failure before RISERS starts skips RISERS, as when they ran in sequence;
+    # one on a later FALLERS chunk can no longer stop a RISERS thread already under way.
+    fallers_started = threading.Event()
+    fallers_failed = threading.Event()
 
-    # Then RISERS — keep your existing behaviour: warn but do not fail the whole run
-    try:
-        post_thread(session, "x_status_risers", "RISERS", soft_fail=True)
-    except Exception as e:
-        print(f"[RISERS] WARNING: posting failed after fallers succeeded: {e}")
+    def run_fallers():
+        try:
+            return post_thread(
+                session, "x_status_fallers", "FALLERS", soft_fail=soft_fail_fallers, first_posted=fallers_started
+            )
+        except Exception:
+            fallers_failed.set()
+            raise
+        finally:
+            fallers_started.set()  # never leave RISERS waiting (nothing to post, or failed)
+
+    def run_risers():
+        fallers_started.wait()
+        if fallers_failed.is_set():
+            print("[RISERS] Skipping: FALLERS posting failed.")
+            return
+        # Keep your existing behaviour: warn but do not fail the whole run
+        try:
+            post_thread(session, "x_status_risers", "RISERS", soft_fail=True)
+        except Exception as e:
+            print(f"[RISERS] WARNING: posting failed: {e}")
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fallers = ex.submit(run_fallers)
+        risers = ex.submit(run_risers)
+        risers.result()
+        fallers.result()  # a hard FALLERS failure still fails the run
 
 
 if __name__ == "__main__":
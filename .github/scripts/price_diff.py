@@ -1,110 +1,322 @@
 #!/usr/bin/env python3
 import datetime as dt
-import json
+import gzip
+import operator
 import os
 import pathlib
 import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
 from typing import Dict, Tuple, List
 from zoneinfo import ZoneInfo
+import ijson
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 FPL_URL = "https://fantasy.premierleague.com/api/bootstrap-static/"
 ROOT = pathlib.Path(".").resolve()
-SNAP_DIR = ROOT / "data" / "snapshots"
-SNAP_DIR.mkdir(parents=True, exist_ok=True)
+DATA_DIR = ROOT / "data"
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+LATEST_PATH = DATA_DIR / "latest.json"  # {player_id: now_cost} from the most recent run
+HISTORY_PATH = DATA_DIR / "history.jsonl.gz"  # one {"date", "prices"} line per run, append-only
+SNAP_DIR = DATA_DIR / "snapshots"  # legacy one-file-per-day snapshots (read-only fallback)
+BOOTSTRAP_CACHE = DATA_DIR / "bootstrap.json"  # last bootstrap-static body, for conditional GETs
+BOOTSTRAP_ETAG = DATA_DIR / "bootstrap.etag"  # ETag that BOOTSTRAP_CACHE was served with
+GZIP_LEVEL = 6
 
 UK_TZ = ZoneInfo("Europe/London")
 TELEGRAM_HARD_LIMIT = 4096
 SAFE_BUDGET = 3900  # keep a buffer for safety
 
+# One pooled session for the FPL API: keep-alive reuse + transport-level retries.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=2,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        ),
+    ),
+)
+_SESSION.headers["User-Agent"] = "FPLPriceBot/1.0 (+https://github.com/JustGeary/FPL_PriceChanges)"
+_SESSION.headers["Accept-Encoding"] = "gzip"  # bootstrap-static shrinks several-fold compressed
+
+
+# The only bootstrap-static fields this script reads, per top-level array.
+_BOOTSTRAP_FIELDS = {
+    "teams": ("id", "short_name"),
+    "events": ("id", "is_current"),
+    "elements": ("id", "web_name", "now_cost", "team", "selected_by_percent"),
+}
+
+
+def get_bootstrap() -> dict:
+    """
+    GET bootstrap-static and stream-parse it, keeping only _BOOTSTRAP_FIELDS.
+
+    The request is conditional on the ETag of the cached body in data/bootstrap.json;
+    on 304 Not Modified the cached copy is parsed instead of downloading it again.
+    Otherwise the body is streamed into the cache in chunks (replacing it atomically),
+    then ijson walks the teams, events and elements arrays one item at a time, so only
+    one full element is ever materialised instead of the whole document's object graph.
+
+    Returns:
+        {"teams": [...], "events": [...], "elements": [...]} of projected dicts
+    """
+    headers = {}
+    if BOOTSTRAP_CACHE.exists() and BOOTSTRAP_ETAG.exists():
+        headers["If-None-Match"] = BOOTSTRAP_ETAG.read_text(encoding="utf-8").strip()
+
+    with _SESSION.get(FPL_URL, headers=headers, timeout=40, stream=True) as r:
+        if r.status_code == 304:
+            print("bootstrap-static not modified; using cached copy.")
+        else:
+            r.raise_for_status()
+            tmp = BOOTSTRAP_CACHE.with_name(BOOTSTRAP_CACHE.name + ".tmp")
+            with tmp.open("wb") as f:
+                for chunk in r.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            os.replace(tmp, BOOTSTRAP_CACHE)
+            etag = r.headers.get("ETag")
+            if etag:
+                write_atomic(BOOTSTRAP_ETAG, etag.encode("utf-8"))
+            else:
+                BOOTSTRAP_ETAG.unlink(missing_ok=True)  # never pair a new body with a stale tag
+
+    with BOOTSTRAP_CACHE.open("rb") as f:
+        return parse_bootstrap(f)
+
+
+def parse_bootstrap(fp) -> dict:
+    """Project each array in _BOOTSTRAP_FIELDS out of the bootstrap JSON in `fp` (a seekable binary file)."""
+    out = {}
+    for array, keys in _BOOTSTRAP_FIELDS.items():
+        fp.seek(0)
+        out[array] = [
+            {k: item.get(k) for k in keys} for item in ijson.items(fp, f"{array}.item", use_float=True)
+        ]
+    return out
+
+
+def parse_percent(value) -> float:
+    """selected_by_percent arrives as a string like "12.3"; fall back to 0.0 if it is missing or junk."""
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def current_gw(events) -> int | None:
+    """Return the id of the event flagged is_current, or None if not found."""
+    for ev in events:
+        if ev.get("is_current"):
+            gw = ev.get("id")
+            return gw if isinstance(gw, int) else None
+    return None
+
 
-def fetch_prices() -> Tuple[Dict[int, Tuple[str, int, int]], Dict[int, str], Dict[int, float]]:
+def fetch_bootstrap() -> Tuple[Dict[int, Tuple[str, int, str]], Dict[int, float], int | None]:
     """
-    Fetch player prices, team short names, and ownership from the FPL API.
+    Fetch player prices (with team short names already resolved), ownership and the
+    current gameweek from a single bootstrap-static request.
 
     Returns:
-        players:    {player_id: (web_name, now_cost, team_id)}
-        team_short: {team_id: short_name}
+        players:    {player_id: (web_name, now_cost, team_short_name)}
         ownership:  {player_id: selected_by_percent (float)}
+        gw:         current gameweek id, or None if not found
     """
-    r = requests.get(FPL_URL, timeout=40)
-    r.raise_for_status()
-    data = r.json()
+    data = get_bootstrap()
 
-    team_short = {int(t["id"]): t["short_name"] for t in data["teams"]}
+    # id / now_cost / team are JSON numbers in the FPL payload, so they decode to ints already.
+    elements = data["elements"]
+    team_short = {t["id"]: t["short_name"] for t in data["teams"]}
+    players = {e["id"]: (e["web_name"], e["now_cost"], team_short.get(e["team"], "")) for e in elements}
+    ownership = {e["id"]: parse_percent(e.get("selected_by_percent")) for e in elements}
 
-    players: Dict[int, Tuple[str, int, int]] = {}
-    ownership: Dict[int, float] = {}
+    return players, ownership, current_gw(data.get("events", []))
 
-    for e in data["elements"]:
-        pid = int(e["id"])
-        name = e["web_name"]
-        cost = int(e["now_cost"])
-        team_id = int(e["team"])
 
-        try:
-            selected = float(e.get("selected_by_percent") or 0.0)
-        except (TypeError, ValueError):
-            selected = 0.0
+def load_latest_snapshot() -> Dict[int, int]:
+    """
+    Return the previous run's {player_id: now_cost} map, keyed by int.
 
-        players[pid] = (name, cost, team_id)
-        ownership[pid] = selected
+    Reads data/latest.json directly; only falls back to the newest legacy file in
+    data/snapshots/ (.json or .json.gz) on the first run after switching to the ledger
+    layout. JSON keys are strings on disk, so they are converted once here rather than
+    per lookup.
+    """
+    if LATEST_PATH.exists():
+        raw = orjson.loads(LATEST_PATH.read_bytes())
+    else:
+        if not SNAP_DIR.is_dir():
+            return {}
+        # One readdir, comparing bare names (ISO dates: max == newest), no Path per entry
+        with os.scandir(SNAP_DIR) as it:
+            latest = max((e.name for e in it if e.name.endswith((".json", ".json.gz"))), default=None)
+        if latest is None:
+            return {}
+        blob = (SNAP_DIR / latest).read_bytes()
+        raw = orjson.loads(gzip.decompress(blob) if latest.endswith(".gz") else blob)
+    return {int(k): v for k, v in raw.items()}
+
+
+def save_snapshot(ts_utc: dt.datetime, costs: Dict[int, int], prev: Dict[int, int]) -> pathlib.Path | None:
+    """
+    Atomically replace data/latest.json with today's {player_id: now_cost} and append it to
+    data/history.jsonl.gz for audit. Each run appends its own gzip member; gzip readers
+    (gzip.open, zcat) see the concatenation as one JSONL stream.
 
-    return players, team_short, ownership
+    Nothing is written when today's prices are identical to `prev` (the snapshot just
+    loaded), so idle runs leave no file or git churn. Returns None in that case.
+    """
+    if costs == prev and LATEST_PATH.exists():
+        return None
 
+    # orjson writes the int ids as JSON string keys itself — same bytes as the old
+    # compact json.dump of a {str(pid): cost} dict, without building that dict.
+    blob = orjson.dumps(costs, option=orjson.OPT_NON_STR_KEYS)
+    write_atomic(LATEST_PATH, blob)
 
-def fetch_current_gw() -> int | None:
-    """Return the current gameweek id from FPL API, or None if not found."""
-    r = requests.get(FPL_URL, timeout=40)
-    r.raise_for_status()
-    data = r.json()
-    for ev in data.get("events", []):
-        if ev.get("is_current"):
-            try:
-                return int(ev["id"])
-            except (TypeError, ValueError):
-                return None
-    return None
+    with gzip.open(HISTORY_PATH, "ab", compresslevel=GZIP_LEVEL) as f:
+        line = {"date": ts_utc.date().isoformat(), "prices": costs}
+        f.write(orjson.dumps(line, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+    return LATEST_PATH
+
+
+def write_atomic(path: pathlib.Path, data: bytes) -> None:
+    """Write the whole file in one go via temp-then-rename, so a killed run never leaves it truncated."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
 
-def load_latest_snapshot() -> Dict[str, int]:
-    snaps = sorted(SNAP_DIR.glob("*.json"))
-    if not snaps:
-        return {}
-    with snaps[-1].open("r", encoding="utf-8") as f:
-        return json.load(f)
+def write_github_outputs(has_changes: bool, date_str: str) -> None:
+    """Append has_changes/date to $GITHUB_OUTPUT in one write (no-op outside Actions)."""
+    gh_out = os.environ.get("GITHUB_OUTPUT")
+    if gh_out:
+        with open(gh_out, "a", encoding="utf-8") as f:
+            f.write(f"has_changes={'true' if has_changes else 'false'}\ndate={date_str}\n")
 
 
-def save_snapshot(ts_utc: dt.datetime, today_map: Dict[int, Tuple[str, int, int]]) -> pathlib.Path:
-    snap_path = SNAP_DIR / f"{ts_utc.date().isoformat()}.json"  # ISO filename for natural sort
-    comp = {str(pid): cost for pid, (_, cost, _) in today_map.items()}
-    with snap_path.open("w", encoding="utf-8") as f:
-        json.dump(comp, f, ensure_ascii=False, separators=(",", ":"))
-    return snap_path
+@dataclass(slots=True)
+class Change:
+    """One player's price move since the previous snapshot (prices in tenths)."""
+
+    id: int
+    name: str
+    team: str
+    old: int
+    new: int
+    ownership: float
+    delta: int = field(init=False)
+    neg_own: float = field(init=False)  # sort key: highest ownership first
+    name_lower: str = field(init=False)  # sort key tie-break, computed once
+
+    def __post_init__(self):
+        self.delta = self.new - self.old
+        self.neg_own = -self.ownership
+        self.name_lower = self.name.lower()
+
+
+_CHANGE_ORDER = operator.attrgetter("neg_own", "name_lower")
+
+# One row template per output; the signed delta ("+0.1m" / "-0.1m") covers risers and fallers alike.
+MD_ROW = "| {name} | {team} | {old} | {new} | {delta} | {own:.1f}% |"
+TG_BULLET = "• <b>{name}</b> ({team}): {delta} → {new}"
+
+# Pulls every field a table row / bullet needs out of a Change in one C call.
+_ROW_FIELDS = operator.attrgetter("name", "team", "old", "new", "delta", "ownership")
+_X_BULLET_FIELDS = operator.attrgetter("name", "team", "new")
+
+# FPL prices live in a narrow band of tenths, so pre-format them once; anything
+# outside the band is formatted on first use and memoised alongside.
+_MONEY_LUT = {i: f"£{i/10:.1f}m" for i in range(20, 200)}
 
 
 def money(tenths: int) -> str:
-    return f"£{tenths/10:.1f}m"
-
-
-def build_lines(risers, fallers) -> List[str]:
-    """Return full (untrimmed) list of HTML-formatted lines with headers and bullets for Telegram."""
-    lines: List[str] = []
-    if risers:
-        lines.append("📈 <b>Risers</b>")
-        for ch in risers:
-            lines.append(
-                f"• <b>{ch['name']}</b> ({ch['team']}): +{ch['delta']/10:.1f}m → {money(ch['new'])}"
-            )
-    if fallers:
-        if lines:
-            lines.append("")  # blank line between groups
-        lines.append("📉 <b>Fallers</b>")
-        for ch in fallers:
-            lines.append(
-                f"• <b>{ch['name']}</b> ({ch['team']}): {ch['delta']/10:.1f}m → {money(ch['new'])}"
-            )
-    return lines
+    text = _MONEY_LUT.get(tenths)
+    if text is None:
+        text = _MONEY_LUT[tenths] = f"£{tenths/10:.1f}m"
+    return text
+
+
+def build_lines(risers, fallers) -> Tuple[List[str], List[Tuple[bool, str]]]:
+    """
+    Walk each change once and emit both its markdown table row and its Telegram bullet.
+
+    Returns:
+        md_lines: the "## Risers" / "## Fallers" table sections for changes.md
+        tg_lines: full (untrimmed) list of (is_header, HTML line) pairs for Telegram; section
+                  headers and the blank spacer between sections are flagged so trimming
+                  can tell them from bullets without inspecting the text
+    """
+    md_lines: List[str] = []
+    tg_lines: List[Tuple[bool, str]] = []
+    md_append, tg_append = md_lines.append, tg_lines.append  # bound once; called per change
+    for title, emoji, group in (("Risers", "📈", risers), ("Fallers", "📉", fallers)):
+        if not group:
+            continue
+        md_lines += [
+            f"## {title}",
+            "| Player | Team | Old | New | Δ | Own% |",
+            "|---|:---:|---:|---:|---:|---:|",
+        ]
+        if tg_lines:
+            tg_append((True, ""))  # blank line between groups
+        tg_append((True, f"{emoji} <b>{title}</b>"))
+        for n, t, o, nw, d, own in map(_ROW_FIELDS, group):
+            delta, new = f"{d/10:+.1f}m", money(nw)  # formatted once, shared by both outputs
+            md_append(MD_ROW.format(name=n, team=t, old=money(o), new=new, delta=delta, own=own))
+            tg_append((False, TG_BULLET.format(name=n, team=t, new=new, delta=delta)))
+        md_append("")
+    return md_lines, tg_lines
+
+
+def fit_telegram(head: str, tagged_lines: List[Tuple[bool, str]], budget: int) -> str:
+    """
+    Return head + as many leading lines as fit in `budget` characters, plus a
+    "(+N more)" note counting the bullets that were cut.
+
+    `tagged_lines` are build_lines' (is_header, text) pairs. Line end offsets are
+    accumulated once and the cut point is found by bisecting them, so the message is
+    joined exactly once however far over budget it is.
+    """
+    is_header = [flag for flag, _ in tagged_lines]
+    lines = [text for _, text in tagged_lines]
+    full = head + "\n".join(lines)
+    if len(full) <= budget:
+        return full
+
+    # ends[i] == len("\n".join(lines[:i + 1])) + 1, so lines[:k] fits iff ends[k - 1] <= room + 1
+    ends = list(accumulate(len(line) + 1 for line in lines))
+
+    # Start by reserving room for the widest note (every bullet hidden); a shorter note
+    # can only free space, so re-fit until the hidden count stops changing.
+    hidden, cut = is_header.count(False), -1
+    while True:
+        note_room = len(f"\n\n(+{hidden} more)")
+        new_cut = bisect_right(ends, budget - len(head) - note_room + 1)
+        if new_cut == cut:
+            break
+        cut, hidden = new_cut, is_header[new_cut:].count(False)
+    # The fixed point can stop one line short when the hidden count drops a digit
+    # (10 -> 9): that freed character may be exactly what lets the next line fit.
+    while cut < len(lines):
+        next_hidden = is_header[cut + 1:].count(False)
+        if ends[cut] > budget - len(head) - len(f"\n\n(+{next_hidden} more)") + 1:
+            break
+        cut, hidden = cut + 1, next_hidden
+    while cut and is_header[cut - 1]:
+        cut -= 1  # don't leave a section header (or its blank spacer) with no bullets under it
+    return head + "\n".join(lines[:cut]) + f"\n\n(+{hidden} more)"
 
 
 def build_x_chunks(
@@ -124,21 +336,22 @@ def build_x_chunks(
     if not items:
         return chunks
 
-    def text_len(lines: List[str]) -> int:
-        return len("\n".join(lines).rstrip())
-
     # First chunk: header + blank + section title
     current_lines: List[str] = [header_text, "", f"{emoji} {title}:"]
-
-    for c in items:
-        bullet = f"• {c['name']} ({c['team']}) {money(c['new'])}"
-        candidate = current_lines + [bullet]
-        if text_len(candidate) <= max_len:
-            current_lines = candidate
+    # Running length of "\n".join(current_lines), so each bullet is an O(1) check
+    current_len = len(header_text) + 1 + 1 + len(current_lines[2])
+    cont_header = f"{emoji} {title} (cont.)"
+
+    for name, team, new in map(_X_BULLET_FIELDS, items):
+        bullet = f"• {name} ({team}) {money(new)}"
+        blen = len(bullet)
+        if current_len + 1 + blen <= max_len:
+            current_lines.append(bullet)
+            current_len += 1 + blen
         else:
             chunks.append("\n".join(current_lines).rstrip())
-            cont_header = f"{emoji} {title} (cont.)"
             current_lines = [cont_header, bullet]
+            current_len = len(cont_header) + 1 + blen
 
     if current_lines:
         chunks.append("\n".join(current_lines).rstrip())
@@ -147,43 +360,39 @@ def build_x_chunks(
 
 
 def main():
-    now_utc = dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc)
+    now_utc = dt.datetime.now(dt.timezone.utc)
     now_uk = now_utc.astimezone(UK_TZ)
     date_str_uk = now_uk.strftime("%d-%m-%Y")  # dd-MM-YYYY
 
-    players, team_short, ownership = fetch_prices()
+    players, ownership, gw = fetch_bootstrap()
     prev = load_latest_snapshot()
-    save_snapshot(now_utc, players)
-
-    changes = []
-    for pid, (name, cost, team_id) in players.items():
-        old = prev.get(str(pid))
-        if old is not None and old != cost:
-            changes.append(
-                {
-                    "id": pid,
-                    "name": name,
-                    "team": team_short.get(team_id, ""),
-                    "old": old,
-                    "new": cost,
-                    "delta": cost - old,
-                    "ownership": ownership.get(pid, 0.0),
-                }
-            )
+    costs = {pid: cost for pid, (_, cost, _) in players.items()}
+    if save_snapshot(now_utc, costs, prev) is None:
+        # Prices identical to the last snapshot (e.g. a same-day re-run): nothing to
+        # diff or announce, so skip building the outputs entirely.
+        print("No price changes since the last snapshot.")
+        write_github_outputs(False, date_str_uk)
+        return
+
+    # Changed prices are the (id, cost) pairs not in the previous snapshot: dict items
+    # views support set difference, so the compare runs in C and only the handful of
+    # actual changes reach Python. Players new since the last snapshot are skipped;
+    # sorting by id keeps the API's element order for ties in the sort below.
+    risers, fallers = [], []
+    for pid, cost in sorted(costs.items() - prev.items()):
+        old = prev.get(pid)
+        if old is None:
+            continue
+        name, _, team = players[pid]
+        (risers if cost > old else fallers).append(Change(pid, name, team, old, cost, ownership.get(pid, 0.0)))
 
     # Sort by highest ownership first, then name
-    risers = sorted(
-        (c for c in changes if c["delta"] > 0),
-        key=lambda x: (-x.get("ownership", 0.0), x["name"].lower()),
-    )
-    fallers = sorted(
-        (c for c in changes if c["delta"] < 0),
-        key=lambda x: (-x.get("ownership", 0.0), x["name"].lower()),
-    )
-    has_changes = bool(changes)
+    risers.sort(key=_CHANGE_ORDER)
+    fallers.sort(key=_CHANGE_ORDER)
+    changes_count = len(risers) + len(fallers)
+    has_changes = changes_count > 0
 
     # Markdown/Telegram header
-    gw = fetch_current_gw()
     if gw is not None:
         header_prefix = f"GW{gw} — {date_str_uk}"
     else:
@@ -191,65 +400,29 @@ def main():
 
     header_counts = f"{header_prefix} (Risers: {len(risers)}, Fallers: {len(fallers)})"
 
+    # One pass over risers/fallers feeds both the markdown table and the Telegram bullets
+    md_body, tg_lines = build_lines(risers, fallers)
+
     # ---------- Markdown (full table) ----------
     md_lines = [f"# FPL Price Changes — {header_counts}\n"]
     if not has_changes:
         md_lines.append("_No price changes detected._\n")
     else:
-        if risers:
-            md_lines += [
-                "## Risers",
-                "| Player | Team | Old | New | Δ | Own% |",
-                "|---|:---:|---:|---:|---:|---:|",
-            ]
-            md_lines += [
-                f"| {c['name']} | {c['team']} | {money(c['old'])} | {money(c['new'])} | +{c['delta']/10:.1f}m | {c.get('ownership', 0.0):.1f}% |"
-                for c in risers
-            ]
-            md_lines.append("")
-        if fallers:
-            md_lines += [
-                "## Fallers",
-                "| Player | Team | Old | New | Δ | Own% |",
-                "|---|:---:|---:|---:|---:|---:|",
-            ]
-            md_lines += [
-                f"| {c['name']} | {c['team']} | {money(c['old'])} | {money(c['new'])} | {c['delta']/10:.1f}m | {c.get('ownership', 0.0):.1f}% |"
-                for c in fallers
-            ]
-            md_lines.append("")
+        md_lines += md_body
         md_lines.append(
-            f"_Total changes: {len(changes)} (Risers: {len(risers)}, Fallers: {len(fallers)})_"
+            f"_Total changes: {changes_count} (Risers: {len(risers)}, Fallers: {len(fallers)})_"
         )
 
-    with open("changes.md", "w", encoding="utf-8") as f:
-        f.write("\n".join(md_lines) + "\n")
+    write_atomic(pathlib.Path("changes.md"), ("\n".join(md_lines) + "\n").encode("utf-8"))
 
     # ---------- Telegram (HTML, dynamic trimming) ----------
     if not has_changes:
         tg = f"<b>FPL Price Changes — {header_counts}</b>\n\nNo changes."
     else:
         head = f"<b>FPL Price Changes — {header_counts}</b>\n\n"
-        lines = build_lines(risers, fallers)
-        hidden = 0
-
-        def assemble(lines_list: List[str], hidden_count: int) -> str:
-            extra = f"\n\n(+{hidden_count} more)" if hidden_count > 0 else ""
-            return head + "\n".join(lines_list) + extra
-
-        while True:
-            msg = assemble(lines, hidden)
-            if len(msg) <= SAFE_BUDGET or not lines:
-                tg = msg
-                break
-            removed = lines.pop()
-            if removed and not removed.startswith(("📈", "📉")):
-                hidden += 1
-            if removed == "" and lines:
-                _hdr = lines.pop()
-
-    with open("tg_message.txt", "w", encoding="utf-8") as f:
-        f.write(tg)
+        tg = fit_telegram(head, tg_lines, SAFE_BUDGET)
+
+    write_atomic(pathlib.Path("tg_message.txt"), tg.encode("utf-8"))
 
     # ---------- X status headers (UPDATED LAYOUT) ----------
     # Requirement:
@@ -268,20 +441,12 @@ def main():
     riser_chunks = build_x_chunks(header_risers, "Risers", "📈", risers)
     faller_chunks = build_x_chunks(header_fallers, "Fallers", "📉", fallers)
 
-    for idx, msg in enumerate(riser_chunks, start=1):
-        with open(f"x_status_risers_{idx}.txt", "w", encoding="utf-8") as f:
-            f.write(msg)
-
-    for idx, msg in enumerate(faller_chunks, start=1):
-        with open(f"x_status_fallers_{idx}.txt", "w", encoding="utf-8") as f:
-            f.write(msg)
+    for kind, chunks in (("risers", riser_chunks), ("fallers", faller_chunks)):
+        for idx, msg in enumerate(chunks, start=1):
+            write_atomic(pathlib.Path(f"x_status_{kind}_{idx}.txt"), msg.encode("utf-8"))
 
     # ---------- GitHub outputs ----------
-    gh_out = os.environ.get("GITHUB_OUTPUT")
-    if gh_out:
-        with open(gh_out, "a", encoding="utf-8") as f:
-            f.write(f"has_changes={'true' if has_changes else 'false'}\n")
-            f.write(f"date={date_str_uk}\n")
+    write_github_outputs(has_changes, date_str_uk)
 
 
 if __name__ == "__main__":